@@ -1,9 +1,10 @@
 import numpy as np
 import argparse
-from datetime import datetime
-from dateutil.relativedelta import relativedelta
+import math
 import sys
 
+MONTH_ABBRS = ('Jan', 'Feb', 'Mar', 'Apr', 'May', 'Jun', 'Jul', 'Aug', 'Sep', 'Oct', 'Nov', 'Dec')
+
 # --- UTILITY FUNCTIONS ---
 
 def calculate_pmt(principal, annual_rate, months):
@@ -11,25 +12,49 @@ def calculate_pmt(principal, annual_rate, months):
     if annual_rate <= 0:
         return principal / months
     r = annual_rate / 100 / 12
-    # Standard mortgage payment formula
-    return principal * (r * (1 + r)**months) / ((1 + r)**months - 1)
+    # Standard mortgage payment formula, with (1 + r)**months - 1 computed once
+    # via expm1/log1p to avoid cancellation for small r
+    cm1 = math.expm1(months * math.log1p(r))
+    return principal * r * (cm1 + 1.0) / cm1
 
 def get_loan_status(principal, annual_rate, total_months, payments_made):
     """Calculates the remaining balance and remaining interest after a number of payments."""
-    balance = principal
     r = annual_rate / 100 / 12
     pmt = calculate_pmt(principal, annual_rate, total_months)
-    
-    for _ in range(1, payments_made + 1):
-        interest = balance * r
-        principal_pay = pmt - interest
-        balance -= principal_pay
-        
+
+    # Closed-form remaining balance: B = P*(1+r)^n - pmt*((1+r)^n - 1)/r
+    if annual_rate == 0:
+        balance = principal - pmt * payments_made
+    else:
+        cm1 = math.expm1(payments_made * math.log1p(r))
+        balance = principal * (cm1 + 1.0) - pmt * cm1 / r
+
     # Calculate total remaining interest on the original loan
     remaining_interest = (pmt * (total_months - payments_made)) - balance
         
     return balance, pmt, remaining_interest
 
+def get_loan_status_vec(principal, annual_rates, total_months, payments_made):
+    """Vectorized get_loan_status over an array of rates; returns (balance, pmt) arrays."""
+    r = annual_rates / 1200.0
+    # Zero rates use the linear branches below; keep the closed form finite for them
+    safe_r = np.where(r == 0, 1.0, r)
+    log1p_r = np.log1p(safe_r)
+
+    cm1 = np.expm1(total_months * log1p_r)
+    pmt = np.where(annual_rates <= 0, principal / total_months, principal * safe_r * (cm1 + 1.0) / cm1)
+
+    cm1_n = np.expm1(payments_made * log1p_r)
+    balance = np.where(
+        annual_rates == 0, principal - pmt * payments_made, principal * (cm1_n + 1.0) - pmt * cm1_n / safe_r
+    )
+
+    return balance, pmt
+
+def format_month(year, month):
+    """Formats a (year, 1-based month) pair as e.g. 'Jul 2035'."""
+    return f"{MONTH_ABBRS[month - 1]} {year}"
+
 def calculate_total_payments_until_sale(payments_made, sell_year, sell_month):
     """
     Calculates the total number of payments made from loan start until the sale date.
@@ -40,22 +65,24 @@ def calculate_total_payments_until_sale(payments_made, sell_year, sell_month):
     CURRENT_YEAR = 2025
     CURRENT_MONTH = 11
 
+    # Dates are handled as absolute month indices (year * 12 + zero-based month)
     # Calculate the month/year of the first payment
-    first_payment_date = datetime(CURRENT_YEAR, CURRENT_MONTH, 1) - relativedelta(months=payments_made - 1)
+    first_idx = CURRENT_YEAR * 12 + (CURRENT_MONTH - 1) - (payments_made - 1)
     
     # Sale date (assuming payment is made in this month)
-    sale_date = datetime(sell_year, sell_month, 1)
+    sale_idx = sell_year * 12 + (sell_month - 1)
 
     # Total number of full payment months between P1 and Sale Date (inclusive)
-    total_months = 12 * (sale_date.year - first_payment_date.year) + (sale_date.month - first_payment_date.month) + 1
+    total_months = sale_idx - first_idx + 1
 
     if total_months < payments_made:
         raise ValueError(
-            f"The calculated sale date ({sale_date.strftime('%b %Y')}) is before the current payment date, "
+            f"The calculated sale date ({format_month(sell_year, sell_month)}) is before the current payment date, "
             f"resulting in only {total_months} total payments."
         )
 
-    return total_months, first_payment_date.strftime('%b %Y')
+    fp_year, fp_month0 = divmod(first_idx, 12)
+    return total_months, format_month(fp_year, fp_month0 + 1)
 
 # --- MAIN ANALYSIS FUNCTION ---
 
@@ -87,6 +114,9 @@ def run_analysis(args):
     closing_costs = remaining_principal * closing_cost_pct
     cost_refi_loan_amt = remaining_principal + closing_costs
     refi_payments_until_sale = months_until_sale - payments_made
+    refi_term = 360
+    pmt_orig_paid = pmt_orig * payments_made
+    orig_total_remaining = pmt_orig * (original_term_months - payments_made)
 
     # --- 2. Calculate Original Loan Cost at Sale (Benchmark) ---
     rem_principal_orig_sale, _, _ = get_loan_status(
@@ -95,115 +125,118 @@ def run_analysis(args):
     total_payments_orig_at_sale = pmt_orig * months_until_sale
     total_cost_orig_at_sale = total_payments_orig_at_sale + rem_principal_orig_sale
 
-    # --- 3. Iterative Search for Tipping Points ---
+    # --- 3. Vectorized Search for Tipping Points ---
     tipping_rate_sale = None
     tipping_rate_lifetime = None
-    search_rates = np.arange(original_rate, 2.99, -0.001)
+    # Descending grid of whole 0.001% steps, from the current rate (floored to the
+    # grid) down to 2.99%; built from integers so every point equals round(rate, 3)
+    top_rate_milli = math.floor(round(original_rate * 1000, 6))
+    search_rates = np.arange(top_rate_milli, 2989, -1) / 1000.0
 
-    for r_new in search_rates:
-        pmt_refi = calculate_pmt(cost_refi_loan_amt, r_new, 360)
+    # Refi payment and balance at sale for every candidate rate at once
+    rem_principal_refi_sale, pmt_refi = get_loan_status_vec(
+        cost_refi_loan_amt, search_rates, refi_term, refi_payments_until_sale
+    )
 
-        # A. Lifetime Tipping Point Check
-        total_payments_orig_remaining = pmt_orig * (original_term_months - payments_made)
-        total_payments_refi_lifetime = pmt_refi * 360
+    # A. Lifetime Tipping Point Check
+    lifetime_mask = pmt_refi * refi_term < orig_total_remaining
 
-        if total_payments_refi_lifetime < total_payments_orig_remaining and tipping_rate_lifetime is None:
-             tipping_rate_lifetime = r_new
+    # B. Time-to-Sell Tipping Point Check
+    total_cost_refi_at_sale = pmt_orig_paid + (pmt_refi * refi_payments_until_sale) + rem_principal_refi_sale
+    sale_mask = total_cost_refi_at_sale < total_cost_orig_at_sale
+
+    # search_rates descends, so the first True in each mask is the tipping point
+    # (np.argmax stops scanning a boolean mask at its first True)
+    if lifetime_mask.any():
+        tipping_rate_lifetime = search_rates[np.argmax(lifetime_mask)]
+    if sale_mask.any():
+        tipping_rate_sale = search_rates[np.argmax(sale_mask)]
 
-        # B. Time-to-Sell Tipping Point Check
-        rem_principal_refi_sale, _, _ = get_loan_status(
-            cost_refi_loan_amt, r_new, 360, refi_payments_until_sale
-        )
-        total_payments_refi_at_sale = (pmt_orig * payments_made) + (pmt_refi * refi_payments_until_sale)
-        total_cost_refi_at_sale = total_payments_refi_at_sale + rem_principal_refi_sale
-        
-        if total_cost_refi_at_sale < total_cost_orig_at_sale and tipping_rate_sale is None:
-            tipping_rate_sale = r_new
-    
     if tipping_rate_sale is None: tipping_rate_sale = original_rate
     if tipping_rate_lifetime is None: tipping_rate_lifetime = original_rate
 
     # --- 4. Generate Output Table Data ---
-    table_rates = sorted(list(set([
-        round(tipping_rate_sale + 0.075, 3), 
-        round(tipping_rate_sale, 3), 
+    candidate_rates = {
+        round(tipping_rate_sale + 0.075, 3),
+        round(tipping_rate_sale, 3),
         round(tipping_rate_sale - 0.25, 3),
         round(tipping_rate_lifetime, 3),
         round(tipping_rate_lifetime - 0.25, 3)
-    ])))
-    table_rates = [r for r in table_rates if r < original_rate]
-    table_rates = sorted(list(set(table_rates)), reverse=True)
-    
-    table_data = [] 
+    }
+    table_rates = sorted((r for r in candidate_rates if r < original_rate), reverse=True)
     
-    for r_new in table_rates:
-        pmt_refi = calculate_pmt(cost_refi_loan_amt, r_new, 360)
-        monthly_savings = pmt_orig - pmt_refi
-
-        # Break-Even Period (in months)
-        if monthly_savings > 0.01:
-            break_even_months = closing_costs / monthly_savings
-        else:
-            break_even_months = float('inf') # Represents no break-even or a loss
-
-        # Savings at Sale
-        rem_principal_refi_sale, _, _ = get_loan_status(cost_refi_loan_amt, r_new, 360, refi_payments_until_sale)
-        total_payments_refi_at_sale = (pmt_orig * payments_made) + (pmt_refi * refi_payments_until_sale)
-        savings_at_sale = total_cost_orig_at_sale - (total_payments_refi_at_sale + rem_principal_refi_sale)
-        
-        # Savings Lifetime
-        total_payments_orig_remaining = pmt_orig * (original_term_months - payments_made)
-        total_payments_refi_lifetime = pmt_refi * 360
-        savings_lifetime = total_payments_orig_remaining - total_payments_refi_lifetime
-
-        table_data.append({
-            'rate': r_new,
-            'monthly_savings': monthly_savings,
-            'break_even_months': break_even_months,
-            'savings_at_sale': savings_at_sale,
-            'savings_lifetime': savings_lifetime
-        })
-
-    # --- 5. Print Results ---
-    print("## 📊 Mortgage Refinance Tipping Point Analysis 🏡")
-    print("-" * 50)
-    print("### 📌 Input Parameters")
-    print(f"| Parameter | Value |")
-    print(f"| :--- | :--- |")
-    print(f"| Original Loan Amount | ${original_loan_amount:,.2f} |")
-    print(f"| Current Interest Rate | {original_rate}% |")
-    print(f"| Loan Start (First Payment) | {first_pmt_date_str} |")
-    print(f"| Payments Made | {payments_made} |")
-    print(f"| Sale Date | {datetime(sell_year, sell_month, 1).strftime('%b %Y')} |")
-    print(f"| **Total Payments Until Sale** | **{months_until_sale}** |")
-    print(f"| Estimated Closing Costs (Rolled In) | ${closing_costs:,.2f} |")
-
-    print("\n### 📉 Critical Tipping Points")
-    print(f"| Tipping Point | Required New Rate | Required Rate Drop |")
-    print(f"| :--- | :--- | :--- |")
-    print(f"| **Time-to-Sell** ({months_until_sale} months) | **{tipping_rate_sale:.3f}%** | **{(original_rate - tipping_rate_sale):.3f}%** |")
-    print(f"| **Entire Loan Lifetime** (30 Years) | **{tipping_rate_lifetime:.3f}%** | **{(original_rate - tipping_rate_lifetime):.3f}%** |")
+    # Table rates lie on the 0.001 sweep grid whenever it covers them, so look them
+    # up by binary search, reuse the sweep's results and only evaluate off-grid rates.
+    rates_arr = np.array(table_rates, dtype=np.float64)
+    ascending_rates = search_rates[::-1]
+    pos = np.minimum(np.searchsorted(ascending_rates, rates_arr - 1e-9), search_rates.size - 1)
+    on_grid = pos >= 0  # False everywhere when the grid is empty
+    on_grid[on_grid] = np.isclose(ascending_rates[pos[on_grid]], rates_arr[on_grid], rtol=0.0, atol=1e-9)
+    grid_idx = search_rates.size - 1 - pos
+
+    pmt_refi_tbl = np.empty_like(rates_arr)
+    rem_refi_sale_tbl = np.empty_like(rates_arr)
+    pmt_refi_tbl[on_grid] = pmt_refi[grid_idx[on_grid]]
+    rem_refi_sale_tbl[on_grid] = rem_principal_refi_sale[grid_idx[on_grid]]
+    rem_refi_sale_tbl[~on_grid], pmt_refi_tbl[~on_grid] = get_loan_status_vec(
+        cost_refi_loan_amt, rates_arr[~on_grid], refi_term, refi_payments_until_sale
+    )
+
+    monthly_savings = pmt_orig - pmt_refi_tbl
+
+    # Break-Even Period (in months); inf represents no break-even or a loss
+    break_even_months = np.full_like(rates_arr, np.inf)
+    np.divide(closing_costs, monthly_savings, out=break_even_months, where=monthly_savings > 0.01)
+
+    # Savings at Sale
+    total_payments_refi_at_sale = pmt_orig_paid + (pmt_refi_tbl * refi_payments_until_sale)
+    savings_at_sale = total_cost_orig_at_sale - (total_payments_refi_at_sale + rem_refi_sale_tbl)
+
+    # Savings Lifetime
+    savings_lifetime = orig_total_remaining - pmt_refi_tbl * refi_term
+
+    # --- 5. Print Results (collected and written in one call) ---
+    out = []
+    out.append("## 📊 Mortgage Refinance Tipping Point Analysis 🏡")
+    out.append("-" * 50)
+    out.append("### 📌 Input Parameters")
+    out.append(f"| Parameter | Value |")
+    out.append(f"| :--- | :--- |")
+    out.append(f"| Original Loan Amount | ${original_loan_amount:,.2f} |")
+    out.append(f"| Current Interest Rate | {original_rate}% |")
+    out.append(f"| Loan Start (First Payment) | {first_pmt_date_str} |")
+    out.append(f"| Payments Made | {payments_made} |")
+    out.append(f"| Sale Date | {format_month(sell_year, sell_month)} |")
+    out.append(f"| **Total Payments Until Sale** | **{months_until_sale}** |")
+    out.append(f"| Estimated Closing Costs (Rolled In) | ${closing_costs:,.2f} |")
+
+    out.append("\n### 📉 Critical Tipping Points")
+    out.append(f"| Tipping Point | Required New Rate | Required Rate Drop |")
+    out.append(f"| :--- | :--- | :--- |")
+    out.append(f"| **Time-to-Sell** ({months_until_sale} months) | **{tipping_rate_sale:.3f}%** | **{(original_rate - tipping_rate_sale):.3f}%** |")
+    out.append(f"| **Entire Loan Lifetime** (30 Years) | **{tipping_rate_lifetime:.3f}%** | **{(original_rate - tipping_rate_lifetime):.3f}%** |")
     
-    print("\n### 📈 Refinance Comparison Table")
-    print("| New Rate | Monthly P&I Savings | Break-Even Period (Months) | Savings at Sale | Savings Lifetime |")
-    print("| :--- | :--- | :--- | :--- | :--- |")
+    out.append("\n### 📈 Refinance Comparison Table")
+    out.append("| New Rate | Monthly P&I Savings | Break-Even Period (Months) | Savings at Sale | Savings Lifetime |")
+    out.append("| :--- | :--- | :--- | :--- | :--- |")
     
-    for row in table_data:
-        rate_str = f"**{row['rate']:.3f}%**" if row['rate'] <= tipping_rate_sale else f"{row['rate']:.3f}%"
-        
-        # Format break-even months
-        if row['break_even_months'] == float('inf'):
-            be_str = "No Break-Even (Loss)"
-        else:
-            be_str = f"{row['break_even_months']:.1f}"
-
-        sale_str = f"${row['savings_at_sale']:,.2f}"
-        lifetime_str = f"${row['savings_lifetime']:,.2f}"
-        
-        sale_status = " (LOSS)" if row['savings_at_sale'] < 0.01 and abs(row['savings_at_sale']) > 0.01 else " (GAIN)"
-        lifetime_status = " (LOSS)" if row['savings_lifetime'] < 0.01 and abs(row['savings_lifetime']) > 0.01 else " (GAIN)"
-        
-        print(f"| {rate_str} | ${row['monthly_savings']:,.2f} | {be_str} | {sale_str}{sale_status} | {lifetime_str}{lifetime_status} |")
+    # Format each column in one pass, then fill a single row template.
+    # (%-formatting has no thousands separator, so money uses format(v, ',.2f'))
+    rate_strs = np.where(rates_arr <= round(tipping_rate_sale, 3), np.char.mod("**%.3f%%**", rates_arr), np.char.mod("%.3f%%", rates_arr))
+    be_strs = np.where(np.isinf(break_even_months), "No Break-Even (Loss)", np.char.mod("%.1f", break_even_months))
+    monthly_strs, sale_strs, life_strs = (
+        [format(v, ',.2f') for v in col.tolist()] for col in (monthly_savings, savings_at_sale, savings_lifetime)
+    )
+    sale_status = np.where((savings_at_sale < 0.01) & (np.abs(savings_at_sale) > 0.01), " (LOSS)", " (GAIN)")
+    lifetime_status = np.where((savings_lifetime < 0.01) & (np.abs(savings_lifetime) > 0.01), " (LOSS)", " (GAIN)")
+
+    row_fmt = "| %s | $%s | %s | $%s%s | $%s%s |"
+    out.extend(
+        row_fmt % row
+        for row in zip(rate_strs, monthly_strs, be_strs, sale_strs, sale_status, life_strs, lifetime_status)
+    )
+
+    sys.stdout.write("\n".join(out) + "\n")
 
 # --- COMMAND LINE ARGUMENT PARSING ---
 